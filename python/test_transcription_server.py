@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for the transcription server using a stub model with the real parakeet-mlx preprocessing.
+"""
+
+import base64
+import io
+import json
+import logging
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip("parakeet_mlx")
+
+from parakeet_mlx.audio import PreprocessArgs
+
+from transcription_server import TranscriptionServer
+
+
+# Preprocessor settings of mlx-community/parakeet-tdt-0.6b-v2
+PREPROCESSOR_CONFIG = PreprocessArgs(
+    sample_rate=16000,
+    normalize="per_feature",
+    window_size=0.025,
+    window_stride=0.01,
+    window="hann",
+    features=128,
+    n_fft=512,
+    dither=1e-05,
+)
+
+
+class StubModel:
+    """Stands in for a Parakeet model, recording the mel spectrograms it is given."""
+
+    def __init__(self):
+        self.preprocessor_config = PREPROCESSOR_CONFIG
+        self.mels = []
+
+    def generate(self, mel):
+        self.mels.append(mel)
+        sentence = SimpleNamespace(text="Hello world.", start=0.0, end=1.0, duration=1.0)
+        return [SimpleNamespace(text="Hello world.", sentences=[sentence])]
+
+
+@pytest.fixture
+def server():
+    server = TranscriptionServer.__new__(TranscriptionServer)
+    server.model = StubModel()
+    server.model_name = "stub"
+    return server
+
+
+def test_warm_up_runs_model(server, caplog):
+    with caplog.at_level(logging.WARNING):
+        server._warm_up()
+
+    assert not caplog.records
+    assert len(server.model.mels) == 1
+    assert server.model.mels[0].shape[-1] == PREPROCESSOR_CONFIG.features
+
+
+def test_transcribe_samples(server):
+    samples = np.zeros(PREPROCESSOR_CONFIG.sample_rate, dtype=np.float32)
+    audio_b64 = base64.b64encode(samples.tobytes()).decode()
+
+    response = server.transcribe_samples(audio_b64, PREPROCESSOR_CONFIG.sample_rate)
+
+    assert response == {
+        "success": True,
+        "text": "Hello world.",
+        "sentences": [{"text": "Hello world.", "start": 0.0, "end": 1.0, "duration": 1.0}],
+    }
+    assert server.model.mels[0].shape[-1] == PREPROCESSOR_CONFIG.features
+
+
+def test_transcribe_samples_rejects_other_sample_rates(server):
+    audio_b64 = base64.b64encode(np.zeros(8000, dtype=np.float32).tobytes()).decode()
+
+    response = server.transcribe_samples(audio_b64, 8000)
+
+    assert "error" in response
+    assert not server.model.mels
+
+
+def test_run_transcribes_audio_b64_command(server, monkeypatch, capsys):
+    samples = np.zeros(PREPROCESSOR_CONFIG.sample_rate, dtype=np.float32)
+    command = {"action": "transcribe", "audio_b64": base64.b64encode(samples.tobytes()).decode()}
+    monkeypatch.setattr("sys.stdin", io.StringIO(json.dumps(command) + "\n"))
+
+    server.run()
+
+    response = json.loads(capsys.readouterr().out)
+    assert response["success"] is True
+    assert response["text"] == "Hello world."
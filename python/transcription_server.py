@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 """
 Transcription server for Voice Transcriber app.
-Listens for audio file paths via stdin and returns transcribed text as JSON.
+Listens for audio file paths (or base64-encoded samples) via stdin and returns transcribed text as JSON.
 """
 
+import base64
 import json
 import sys
 import logging
@@ -11,102 +12,157 @@ from pathlib import Path
 from typing import Optional
 
 try:
+    import mlx.core as mx
+    import numpy as np
     from parakeet_mlx import from_pretrained
+    from parakeet_mlx.audio import get_logmel
 except ImportError:
     print(json.dumps({"error": "parakeet_mlx not installed. Run: uv add parakeet-mlx"}))
     sys.exit(1)
 
+try:
+    import orjson
+
+    def dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+
+    loads = orjson.loads
+except ImportError:
+    dumps = json.dumps
+    loads = json.loads
+
+logger = logging.getLogger(__name__)
+
 
 class TranscriptionServer:
     def __init__(self, model_name: str = "mlx-community/parakeet-tdt-0.6b-v2"):
         self.model = None
         self.model_name = model_name
         self._load_model()
+        self._warm_up()
     
     def _load_model(self):
         """Load the Parakeet model."""
         try:
-            logging.info(f"Loading model: {self.model_name}")
+            logger.info("Loading model: %s", self.model_name)
             self.model = from_pretrained(self.model_name)
-            logging.info("Model loaded successfully")
+            logger.info("Model loaded successfully")
         except Exception as e:
-            logging.error(f"Failed to load model: {e}")
+            logger.error("Failed to load model: %s", e)
             raise
     
+    def _warm_up(self):
+        """Run one second of silence through the model to compile Metal kernels before the first request."""
+        try:
+            logger.info("Warming up model")
+            config = self.model.preprocessor_config
+            silence = mx.zeros(config.sample_rate)
+            self.model.generate(get_logmel(silence, config))
+            logger.info("Model warm-up complete")
+        except Exception as e:
+            logger.warning("Model warm-up failed: %s", e)
+    
     def transcribe(self, audio_path: str) -> dict:
         """Transcribe audio file and return result as dict."""
         try:
             if not Path(audio_path).exists():
                 return {"error": f"Audio file not found: {audio_path}"}
             
-            logging.info(f"Transcribing: {audio_path}")
+            logger.info("Transcribing: %s", audio_path)
             result = self.model.transcribe(audio_path)
             
-            return {
-                "success": True,
-                "text": result.text,
-                "sentences": [
-                    {
-                        "text": sentence.text,
-                        "start": sentence.start,
-                        "end": sentence.end,
-                        "duration": sentence.duration
-                    }
-                    for sentence in result.sentences
-                ]
-            }
+            return self._format_result(result)
+        except Exception as e:
+            logger.error("Transcription failed: %s", e)
+            return {"error": f"Transcription failed: {str(e)}"}
+    
+    def transcribe_samples(self, audio_b64: str, sample_rate: int) -> dict:
+        """Transcribe base64-encoded float32 PCM samples and return result as dict."""
+        try:
+            config = self.model.preprocessor_config
+            if sample_rate != config.sample_rate:
+                return {"error": f"Unsupported sample rate: {sample_rate} (expected {config.sample_rate})"}
+            
+            samples = np.frombuffer(base64.b64decode(audio_b64), dtype=np.float32)
+            logger.info("Transcribing %d in-memory samples", len(samples))
+            audio = mx.array(samples)
+            result = self.model.generate(get_logmel(audio, config))[0]
+            
+            return self._format_result(result)
         except Exception as e:
-            logging.error(f"Transcription failed: {e}")
+            logger.error("Transcription failed: %s", e)
             return {"error": f"Transcription failed: {str(e)}"}
     
+    def _format_result(self, result) -> dict:
+        """Convert a Parakeet result into the response dict."""
+        return {
+            "success": True,
+            "text": result.text,
+            "sentences": [
+                {
+                    "text": sentence.text,
+                    "start": sentence.start,
+                    "end": sentence.end,
+                    "duration": sentence.duration
+                }
+                for sentence in result.sentences
+            ]
+        }
+    
     def run(self):
         """Main server loop - read commands from stdin."""
-        logging.info("Transcription server started and listening for commands")
+        logger.info("Transcription server started and listening for commands")
         
         for line in sys.stdin:
             try:
-                logging.info(f"Received command: {line.strip()}")
-                command = json.loads(line.strip())
+                logger.debug("Received command: %s", line.strip())
+                command = loads(line.strip())
                 action = command.get("action")
-                logging.info(f"Processing action: {action}")
+                logger.info("Processing action: %s", action)
                 
                 if action == "transcribe":
+                    audio_b64 = command.get("audio_b64")
                     audio_path = command.get("audio_path")
-                    if not audio_path:
-                        logging.error("Transcribe command missing audio_path parameter")
-                        response = {"error": "Missing audio_path parameter"}
+                    if audio_b64:
+                        sample_rate = command.get("sample_rate", self.model.preprocessor_config.sample_rate)
+                        logger.info("Starting transcription for in-memory audio")
+                        response = self.transcribe_samples(audio_b64, sample_rate)
+                        logger.info("Transcription completed")
+                    elif not audio_path:
+                        logger.error("Transcribe command missing audio_path or audio_b64 parameter")
+                        response = {"error": "Missing audio_path or audio_b64 parameter"}
                     else:
-                        logging.info(f"Starting transcription for: {audio_path}")
+                        logger.info("Starting transcription for: %s", audio_path)
                         response = self.transcribe(audio_path)
-                        logging.info(f"Transcription completed with response: {response}")
+                        logger.info("Transcription completed")
                 
                 elif action == "ping":
-                    logging.info("Ping command received")
+                    logger.info("Ping command received")
                     response = {"success": True, "message": "pong"}
                 
                 elif action == "quit":
-                    logging.info("Quit command received")
+                    logger.info("Quit command received")
                     response = {"success": True, "message": "Shutting down"}
-                    print(json.dumps(response))
+                    print(dumps(response))
                     break
                 
                 else:
-                    logging.warning(f"Unknown action received: {action}")
+                    logger.warning("Unknown action received: %s", action)
                     response = {"error": f"Unknown action: {action}"}
                 
-                logging.info(f"Sending response: {response}")
-                print(json.dumps(response))
+                logger.debug("Sending response: %s", response)
+                print(dumps(response))
                 sys.stdout.flush()
                 
             except json.JSONDecodeError as e:
-                logging.error(f"JSON decode error: {str(e)}")
+                logger.error("JSON decode error: %s", e)
                 error_response = {"error": f"Invalid JSON: {str(e)}"}
-                print(json.dumps(error_response))
+                print(dumps(error_response))
                 sys.stdout.flush()
             except Exception as e:
-                logging.error(f"Unexpected server error: {str(e)}")
+                logger.error("Unexpected server error: %s", e)
                 error_response = {"error": f"Server error: {str(e)}"}
-                print(json.dumps(error_response))
+                print(dumps(error_response))
                 sys.stdout.flush()
 
 
@@ -125,8 +181,8 @@ def main():
         server = TranscriptionServer()
         server.run()
     except Exception as e:
-        logging.error(f"Server startup failed: {e}")
-        print(json.dumps({"error": f"Server startup failed: {str(e)}"}))
+        logger.error("Server startup failed: %s", e)
+        print(dumps({"error": f"Server startup failed: {str(e)}"}))
         sys.exit(1)
 
 